@@ -0,0 +1,182 @@
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from search_engine import EngineHolder, EngineWatcher, SearchEngine
+
+WORKERS = os.cpu_count() or 1
+BATCH_WINDOW = 0.005
+MAX_BATCH_SIZE = 32
+MAX_PENDING = 256
+REQUEST_TIMEOUT = 2.0
+WARM_UP_TIMEOUT = 60.0
+TOP_N = 10
+
+holder: Optional[EngineHolder] = None
+startup_barrier = None
+
+
+def init_worker(barrier) -> None:
+    # Каждый процесс держит свой движок и сам подхватывает новые поколения индекса
+    global holder, startup_barrier
+    holder = EngineHolder(SearchEngine.load_current())
+    startup_barrier = barrier
+    EngineWatcher(holder).start()
+
+
+def warm_up() -> int:
+    # Задача держит свой процесс, пока все WORKERS процессов не загрузят движок,
+    # поэтому каждая из WORKERS задач попадает в отдельный процесс
+    startup_barrier.wait(WARM_UP_TIMEOUT)
+    return os.getpid()
+
+
+def search_batch(queries: List[str], top_n: int) -> List[List[Tuple[str, float]]]:
+    return holder.engine.search_many(queries, top_n)
+
+
+class Overloaded(Exception):
+    pass
+
+
+class QueryBatcher:
+    """Собирает запросы, пришедшие за BATCH_WINDOW секунд, в одну пачку для пула процессов"""
+
+    def __init__(self, executor: ProcessPoolExecutor) -> None:
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.pending = 0
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def search(self, query: str) -> List[Tuple[str, float]]:
+        if self.pending >= MAX_PENDING:
+            raise Overloaded
+        self.pending += 1
+        try:
+            future = asyncio.get_running_loop().create_future()
+            await self.queue.put((query, future))
+            return await asyncio.wait_for(future, REQUEST_TIMEOUT)
+        finally:
+            self.pending -= 1
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + BATCH_WINDOW
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            loop.create_task(self.dispatch(batch))
+
+    async def dispatch(self, batch) -> None:
+        batch = [(query, future) for query, future in batch if not future.done()]
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, search_batch, [query for query, _ in batch], TOP_N
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def close(self) -> None:
+        self.task.cancel()
+
+
+executor: Optional[ProcessPoolExecutor] = None
+batcher: Optional[QueryBatcher] = None
+
+
+def get_batcher() -> QueryBatcher:
+    global executor, batcher
+    if batcher is None:
+        executor = ProcessPoolExecutor(
+            max_workers=WORKERS, initializer=init_worker, initargs=(multiprocessing.Barrier(WORKERS),)
+        )
+        batcher = QueryBatcher(executor)
+    return batcher
+
+
+async def send_json(send, status: int, body: dict) -> None:
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json; charset=utf-8")],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def start_workers() -> None:
+    """Запускает все процессы пула и ждет загрузки движка до первого запроса"""
+    get_batcher()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(executor, warm_up) for _ in range(WORKERS)))
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await start_workers()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if batcher is not None:
+                batcher.close()
+                executor.shutdown(cancel_futures=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    """ASGI-приложение: GET /search?q=<запрос> возвращает top-N документов в JSON"""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    if scope["path"] != "/search":
+        await send_json(send, 404, {"error": "Not found"})
+        return
+
+    query = parse_qs(scope["query_string"].decode("utf-8")).get("q", [""])[0].strip()
+    if not query:
+        await send_json(send, 400, {"error": "Пустой запрос"})
+        return
+
+    try:
+        results = await get_batcher().search(query)
+    except Overloaded:
+        await send_json(send, 503, {"error": "Сервер перегружен, повторите запрос позже"})
+        return
+    except asyncio.TimeoutError:
+        await send_json(send, 504, {"error": "Превышено время ожидания"})
+        return
+
+    await send_json(send, 200, {
+        "query": query,
+        "results": [{"doc_id": doc_id, "score": score} for doc_id, score in results],
+    })
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=8000)
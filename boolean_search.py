@@ -1,7 +1,7 @@
 import json
 from collections import defaultdict
 
-import pymorphy2
+from query_analyzer import normal_form
 
 INDEX_PATH = "inverted_index.txt"
 
@@ -14,11 +14,9 @@ class BooleanSearch:
 
     def __init__(self) -> None:
         self.inverted_index = self.get_inverted_index()
-        self.morph = pymorphy2.MorphAnalyzer()
 
     def get_normal_form(self, word):
-        morph = self.morph.parse(word)
-        return morph[0].normal_form
+        return normal_form(word)
 
     def search(self, string):
         words = string.strip().split()
@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import heapq
+import math
+import os
+import random
+import re
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from index_search import FILES_PATH, lemmatisation
+
+HLL_PRECISION = 14
+CMS_WIDTH = 1 << 14
+CMS_DEPTH = 4
+HEAVY_HITTERS = 20
+# Точное df считается для не более чем DF_SAMPLE_SIZE лемм, выбранных по хешу
+DF_SAMPLE_SIZE = 4096
+PARSE_CACHE_SIZE = 200_000
+
+
+def hash64(item: str) -> int:
+    return int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Оценка числа различных элементов в 2^precision байтах"""
+
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, item: str) -> None:
+        value = hash64(item)
+        index = value >> (64 - self.precision)
+        rest = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            return self.size * math.log(self.size / zeros)
+        return estimate
+
+
+class CountMinSketch:
+    """Оценка частот сверху с ограниченной памятью"""
+
+    def __init__(self, width: int = CMS_WIDTH, depth: int = CMS_DEPTH) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = [array("I", [0]) * width for _ in range(depth)]
+
+    def _columns(self, item: str):
+        value = hash64(item)
+        first, second = value >> 32, value & 0xFFFFFFFF
+        return ((first + row * second) % self.width for row in range(self.depth))
+
+    def add(self, item: str) -> int:
+        """Добавляет элемент и возвращает новую оценку его частоты"""
+        estimate = None
+        for row, column in enumerate(self._columns(item)):
+            self.table[row][column] += 1
+            value = self.table[row][column]
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        return min(self.table[row][column] for row, column in enumerate(self._columns(item)))
+
+
+class CorpusStatistics:
+    def __init__(self, lemmatisator) -> None:
+        self.lemmatisator = lemmatisator
+        self.parse = lru_cache(maxsize=PARSE_CACHE_SIZE)(
+            lambda token: lemmatisator.morph_analyzer.parse(token)[0]
+        )
+        self.documents = 0
+        self.tokens = HyperLogLog()
+        self.vocabulary = HyperLogLog()
+        self.df = CountMinSketch()
+        self.heavy_hitters: Dict[str, int] = {}
+        self.sampled_df = Counter()
+        # В выборке леммы с hash % sample_rate == 0; при переполнении доля уменьшается вдвое
+        self.sample_rate = 1
+        self.filtered = Counter()
+        self.growth: List[tuple] = []
+
+    def add_document(self, text: str) -> None:
+        tokens = set(self.lemmatisator.tokenizer.tokenize(text))
+        lemmas = set()
+        for token in tokens:
+            self.tokens.add(token)
+            morph = self.parse(token)
+            reason = self.lemmatisator.filter_reason(token, morph)
+            self.filtered[reason or "kept"] += 1
+            if reason is None:
+                lemmas.add(morph.normal_form)
+
+        for lemma in lemmas:
+            self.vocabulary.add(lemma)
+            self.track_heavy_hitter(lemma, self.df.add(lemma))
+            self.sample_df(lemma)
+
+        self.documents += 1
+        if self.documents & (self.documents - 1) == 0:
+            self.growth.append((self.documents, self.vocabulary.estimate()))
+
+    def sample_df(self, lemma: str) -> None:
+        if hash64(lemma) % self.sample_rate:
+            return
+        self.sampled_df[lemma] += 1
+        while len(self.sampled_df) > DF_SAMPLE_SIZE:
+            # Выборки вложены: оставшиеся леммы попадали в выборку с самого начала,
+            # поэтому их df остается точным
+            self.sample_rate *= 2
+            self.sampled_df = Counter({
+                sampled: df for sampled, df in self.sampled_df.items() if hash64(sampled) % self.sample_rate == 0
+            })
+
+    def track_heavy_hitter(self, lemma: str, estimate: int) -> None:
+        if lemma in self.heavy_hitters or len(self.heavy_hitters) < HEAVY_HITTERS:
+            self.heavy_hitters[lemma] = estimate
+            return
+        weakest = min(self.heavy_hitters, key=self.heavy_hitters.get)
+        if estimate > self.heavy_hitters[weakest]:
+            del self.heavy_hitters[weakest]
+            self.heavy_hitters[lemma] = estimate
+
+    def posting_length_histogram(self) -> Dict[int, int]:
+        """Число лемм по длине списка документов (корзины по степеням двойки)"""
+        histogram = Counter()
+        for df in self.sampled_df.values():
+            histogram[1 << (df.bit_length() - 1)] += self.sample_rate
+        return dict(sorted(histogram.items()))
+
+    def df_quantiles(self, quantiles=(0.5, 0.9, 0.99)) -> Dict[float, int]:
+        values = sorted(self.sampled_df.values())
+        if not values:
+            return {}
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in quantiles}
+
+    def report(self) -> None:
+        print(f"Документов: {self.documents}")
+        print(f"Различных токенов (оценка): {self.tokens.estimate():.0f}")
+        print(f"Словарь лемм (оценка): {self.vocabulary.estimate():.0f}")
+
+        print("\nРост словаря:")
+        for documents, vocabulary in self.growth + [(self.documents, self.vocabulary.estimate())]:
+            print(f"  {documents:>6} документов: {vocabulary:.0f} лемм")
+
+        total = sum(self.filtered.values()) or 1
+        print("\nДоля токенов по результату фильтрации:")
+        for reason, count in self.filtered.most_common():
+            print(f"  {reason}: {count / total:.2%}")
+
+        print("\nКвантили df:")
+        for quantile, df in self.df_quantiles().items():
+            print(f"  {quantile:.0%}: {df}")
+
+        print("\nДлины списков документов (оценка):")
+        for bucket, lemmas in self.posting_length_histogram().items():
+            print(f"  {bucket:>6}-{2 * bucket - 1:<6} {lemmas}")
+
+        print("\nСамые частые леммы (df, оценка сверху):")
+        for lemma, df in heapq.nlargest(HEAVY_HITTERS, self.heavy_hitters.items(), key=lambda x: x[1]):
+            print(f"  {lemma}: {df}")
+
+
+def corpus_pages(sample: Optional[int] = None, seed: int = 0) -> List[str]:
+    pages = sorted(
+        (name for name in os.listdir(FILES_PATH) if re.fullmatch(r"page_\d+\.html", name)),
+        key=lambda name: int(re.search(r"\d+", name).group())
+    )
+    if sample is not None and sample < len(pages):
+        pages = sorted(random.Random(seed).sample(pages, sample), key=pages.index)
+    return [os.path.join(FILES_PATH, name) for name in pages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Статистика корпуса для быстрой проверки индексации")
+    parser.add_argument("--sample", type=int, help="обработать случайную выборку из N страниц")
+    parser.add_argument("--seed", type=int, default=0, help="seed выборки")
+    parser.add_argument("--min-score", type=float, help="порог score вместо Lemmatisator.MIN_SCORE")
+    parser.add_argument("--bad-tags", help="теги через запятую вместо Lemmatisator.BAD_TOKENS_TAGS")
+    args = parser.parse_args()
+
+    lemmatisator = lemmatisation.Lemmatisator()
+    if args.min_score is not None:
+        lemmatisator.MIN_SCORE = args.min_score
+    if args.bad_tags is not None:
+        lemmatisator.BAD_TOKENS_TAGS = {tag.strip() for tag in args.bad_tags.split(",") if tag.strip()}
+
+    statistics = CorpusStatistics(lemmatisator)
+    for path in corpus_pages(args.sample, args.seed):
+        statistics.add_document(lemmatisation.get_text_from_html(path))
+    statistics.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,13 @@ import requests
 from urllib.parse import urljoin
 from langdetect import detect
 
+import link_graph
+import near_duplicates
+from index_search import lemmatisation
+
+# Включать после запуска near_duplicates.py, который находит шаблон сайта (common_shingles.txt)
+DETECT_NEAR_DUPLICATES = False
+
 
 def is_russian(text):
     try:
@@ -33,8 +40,11 @@ def get_links(soup, base_url):
     return links
 
 
-def get_unique_urls(start_url, max_urls=150):
+def get_unique_urls(start_url, max_urls=150, duplicate_detector=None, outlinks=None):
     visited_urls = set()
+    # Почти-дубликаты не попадают в visited_urls, но и в очередь повторно ставиться не должны
+    duplicate_urls = set()
+    lemmatisator = lemmatisation.Lemmatisator() if duplicate_detector is not None else None
     urls_to_visit = [start_url]
     count_url = 0
     while urls_to_visit and len(visited_urls) < max_urls:
@@ -46,10 +56,24 @@ def get_unique_urls(start_url, max_urls=150):
             continue
         text = soup.get_text().strip()
         if text and is_russian(text):
+            if duplicate_detector is not None:
+                terms = near_duplicates.page_terms(near_duplicates.main_text(soup), lemmatisator)
+                canonical = duplicate_detector.add(current_url, terms)
+                if canonical is not None:
+                    duplicate_urls.add(current_url)
+                    print(f"Near-duplicate of {canonical}, outlinks skipped")
+                    continue
             visited_urls.add(current_url)
             links = get_links(soup, current_url)
+            if outlinks is not None:
+                outlinks[current_url] = links
             for link in links:
-                if link not in visited_urls and link not in urls_to_visit and "#" not in link:
+                if (
+                        link not in visited_urls
+                        and link not in duplicate_urls
+                        and link not in urls_to_visit
+                        and "#" not in link
+                ):
                     urls_to_visit.append(link)
 
                 if len(visited_urls) >= max_urls:
@@ -59,9 +83,17 @@ def get_unique_urls(start_url, max_urls=150):
     return list(visited_urls)[:max_urls]
 
 
-start_url = "https://ru.wikipedia.org/wiki/Сёрфинг"
-unique_urls = get_unique_urls(start_url, 150)
+if __name__ == "__main__":
+    start_url = "https://ru.wikipedia.org/wiki/Сёрфинг"
+    outlinks = {}
+    duplicate_detector = (
+        near_duplicates.NearDuplicateDetector(near_duplicates.load_common_shingles())
+        if DETECT_NEAR_DUPLICATES else None
+    )
+    unique_urls = get_unique_urls(start_url, 150, duplicate_detector, outlinks)
+
+    with open('urls.txt', 'w') as f:
+        for url in unique_urls:
+            f.write("%s\n" % url)
 
-with open('urls.txt', 'w') as f:
-    for url in unique_urls:
-        f.write("%s\n" % url)
\ No newline at end of file
+    link_graph.write_link_graph(dict(enumerate(unique_urls, start=1)), outlinks)
@@ -0,0 +1,59 @@
+import os
+import shutil
+import time
+from typing import Optional
+
+GENERATIONS_DIR = "generations"
+CURRENT_FILE = os.path.join(GENERATIONS_DIR, "CURRENT")
+
+# Файлы, из которых состоит одно поколение индекса
+GENERATION_FILES = ("lemmas.txt", "inverted_index.txt", "pagerank.txt")
+GENERATION_DIRS = ("lemmas_tf_idf",)
+
+
+def generation_path(name: str) -> str:
+    return os.path.join(GENERATIONS_DIR, name)
+
+
+def current_generation() -> Optional[str]:
+    try:
+        with open(CURRENT_FILE, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def create_generation(source: str = ".") -> str:
+    """Копирует только что построенный индекс в новый каталог поколения"""
+    stamp = time.strftime("%Y%m%d%H%M%S")
+    name = stamp
+    attempt = 0
+    # Несколько сборок за одну секунду получают суффиксы _1, _2, ...
+    while True:
+        target = generation_path(name)
+        try:
+            os.makedirs(target)
+            break
+        except FileExistsError:
+            attempt += 1
+            name = f"{stamp}_{attempt}"
+    for filename in GENERATION_FILES:
+        if os.path.exists(os.path.join(source, filename)):
+            shutil.copy2(os.path.join(source, filename), target)
+    for dirname in GENERATION_DIRS:
+        shutil.copytree(os.path.join(source, dirname), os.path.join(target, dirname))
+    return name
+
+
+def publish_generation(name: str) -> None:
+    """Атомарно переключает CURRENT на поколение name"""
+    tmp_path = CURRENT_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp_path, CURRENT_FILE)
+
+
+if __name__ == "__main__":
+    generation = create_generation()
+    publish_generation(generation)
+    print(f"Published generation {generation}")
@@ -0,0 +1,184 @@
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from task5_search import load_lemmas, load_tfidf_data, process_query
+
+IMPACT_DIR = 'impact_index/'
+POSTINGS_FILE = 'postings.bin'
+LEXICON_FILE = 'lexicon.txt'
+META_FILE = 'meta.json'
+
+IMPACT_LEVELS = 255
+TOP_N = 10
+
+SEGMENT_HEADER = struct.Struct('<BI')
+
+
+def quantize(impact: float, max_impact: float) -> int:
+    return max(1, round(impact / max_impact * IMPACT_LEVELS))
+
+
+def build_impact_index(directory: str = IMPACT_DIR) -> None:
+    """Строит индекс, где у каждой пары (лемма, документ) свой 8-битный вклад в косинус.
+
+    Вклад — tf-idf, деленный на длину вектора документа. Документы леммы
+    сгруппированы в сегменты по значению вклада, сегменты идут по убыванию.
+    """
+    doc_tfidf, doc_lengths = load_tfidf_data()
+    impacts = defaultdict(list)
+    for doc_name, lemmas in doc_tfidf.items():
+        doc_id = int(doc_name.replace('page_', '').replace('.txt', ''))
+        for lemma, tfidf in lemmas.items():
+            if tfidf > 0:
+                impacts[lemma].append((tfidf / doc_lengths[doc_name], doc_id))
+
+    max_impact = max(impact for postings in impacts.values() for impact, _ in postings)
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, POSTINGS_FILE), 'wb') as postings_file, \
+            open(os.path.join(directory, LEXICON_FILE), 'w', encoding='utf-8') as lexicon_file:
+        for lemma, postings in impacts.items():
+            segments = defaultdict(list)
+            for impact, doc_id in postings:
+                segments[quantize(impact, max_impact)].append(doc_id)
+
+            lexicon_file.write(f"{lemma} {postings_file.tell()} {len(segments)}\n")
+            for impact in sorted(segments, reverse=True):
+                doc_ids = sorted(segments[impact])
+                postings_file.write(SEGMENT_HEADER.pack(impact, len(doc_ids)))
+                postings_file.write(struct.pack(f'<{len(doc_ids)}I', *doc_ids))
+
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({"scale": max_impact / IMPACT_LEVELS}, f)
+
+
+class ImpactSearch:
+    """Ранжирование score-at-a-time по квантованному индексу вкладов"""
+
+    def __init__(self, directory: str = IMPACT_DIR) -> None:
+        with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+            self.scale = json.load(f)["scale"]
+
+        self.lexicon = {}
+        with open(os.path.join(directory, LEXICON_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                lemma, offset, segments = line.split()
+                self.lexicon[lemma] = (int(offset), int(segments))
+
+        with open(os.path.join(directory, POSTINGS_FILE), 'rb') as f:
+            self.postings = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_segments(self, lemma: str) -> List[Tuple[int, Tuple[int, ...]]]:
+        if lemma not in self.lexicon:
+            return []
+        offset, count = self.lexicon[lemma]
+        segments = []
+        for _ in range(count):
+            impact, size = SEGMENT_HEADER.unpack_from(self.postings, offset)
+            offset += SEGMENT_HEADER.size
+            segments.append((impact, struct.unpack_from(f'<{size}I', self.postings, offset)))
+            offset += 4 * size
+        return segments
+
+    def search(
+            self,
+            query_lemmas: List[str],
+            top_n: int = TOP_N,
+            max_postings: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """Накапливает вклады сегментами в порядке убывания.
+
+        Останавливается, как только оставшиеся сегменты не могут изменить
+        состав top_n, или после max_postings обработанных записей — это
+        приближенный режим с настраиваемым балансом точности и скорости.
+        После остановки вклады документов из top_n дочитываются из оставшихся
+        сегментов, так что их оценки и порядок точные (в приближенном режиме
+        неточным может быть только состав top_n).
+        """
+        terms = list(set(query_lemmas))
+        term_segments = [self.read_segments(lemma) for lemma in terms]
+        order = sorted(
+            ((impact, term, position)
+             for term, segments in enumerate(term_segments)
+             for position, (impact, _) in enumerate(segments)),
+            reverse=True
+        )
+        # Максимальный еще не учтенный вклад каждого терма
+        remaining = [segments[0][0] if segments else 0 for segments in term_segments]
+
+        accumulators: Dict[int, int] = defaultdict(int)
+        processed = 0
+        stopped = len(order)
+        for step, (impact, term, position) in enumerate(order):
+            for doc_id in term_segments[term][position][1]:
+                accumulators[doc_id] += impact
+            processed += len(term_segments[term][position][1])
+
+            segments = term_segments[term]
+            remaining[term] = segments[position + 1][0] if position + 1 < len(segments) else 0
+
+            if max_postings is not None and processed >= max_postings or \
+                    self.top_is_final(accumulators, sum(remaining), top_n):
+                stopped = step + 1
+                break
+
+        top = dict(heapq.nlargest(top_n, accumulators.items(), key=lambda x: x[1]))
+        for impact, term, position in order[stopped:]:
+            doc_ids = term_segments[term][position][1]
+            for doc_id in top:
+                index = bisect_left(doc_ids, doc_id)
+                if index < len(doc_ids) and doc_ids[index] == doc_id:
+                    top[doc_id] += impact
+
+        query_length = math.sqrt(len(terms)) if terms else 1.0
+        top = sorted(top.items(), key=lambda x: x[1], reverse=True)
+        return [(str(doc_id), score * self.scale / query_length) for doc_id, score in top]
+
+    @staticmethod
+    def top_is_final(accumulators: Dict[int, int], bound: int, top_n: int) -> bool:
+        if bound == 0:
+            return True
+        if len(accumulators) < top_n:
+            return False
+        scores = heapq.nlargest(top_n + 1, accumulators.values())
+        threshold = scores[top_n - 1]
+        challenger = scores[top_n] if len(scores) > top_n else 0
+        # Документ вне top_n, в том числе еще не встреченный, не догонит порог
+        return challenger + bound <= threshold
+
+
+def main():
+    if not os.path.exists(IMPACT_DIR):
+        print("Построение индекса вкладов...")
+        build_impact_index()
+
+    lemmas = load_lemmas()
+    engine = ImpactSearch()
+    print("Поисковая система готова к работе. Вводите запросы.")
+
+    while True:
+        query = input("\nПоисковый запрос (или 'q' для выхода): ").strip()
+        if query.lower() == 'q':
+            break
+
+        query_lemmas = process_query(query, lemmas)
+        if not query_lemmas:
+            print("Не найдено подходящих лемм для запроса.")
+            continue
+
+        results = engine.search(query_lemmas)
+        if not results:
+            print("Ничего не найдено.")
+        for doc_id, score in results:
+            print(f"Документ {doc_id}: {score:.6f}")
+
+
+if __name__ == '__main__':
+    main()
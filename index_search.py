@@ -1,9 +1,25 @@
+import heapq
+import json
 import os
+import shutil
 from collections import defaultdict
 from importlib import util
+from itertools import groupby
+
+from bs4 import BeautifulSoup
+
+import link_graph
+import near_duplicates
 
 FILES_PATH = "downloaded_pages"
 INVERTED_INDEX_PATH = "inverted_index.txt"
+RUNS_PATH = "index_runs"
+# Ограничивает память индексации независимо от размера корпуса. Поиск
+# почти-дубликатов хранит подпись каждого документа, поэтому он вынесен
+# в отдельный проход (near_duplicates.py) и по умолчанию здесь выключен
+MAX_POSTINGS_IN_MEMORY = 500_000
+# Сколько прогонов сливается за раз; при большем числе слияние идет в несколько проходов
+MERGE_FAN_IN = 64
 
 
 def module_from_file(module_name, file_path):
@@ -17,22 +33,107 @@ lemmatisation = module_from_file(
     "task_02", "task_02/tokens_and_lemmas_generator.py")
 
 class IndexInverter:
-    def __init__(self) -> None:
+    def __init__(self, detect_duplicates=False, collapse_duplicates=False, max_postings=None) -> None:
         self.inverted_index = defaultdict(list)
+        self.max_postings = max_postings
+        self.postings_in_memory = 0
+        self.runs = []
+        self.run_count = 0
+        # Почти-дубликаты записываются в duplicates.txt; выбрасываются из индекса
+        # только при collapse_duplicates. Нужен common_shingles.txt из near_duplicates.py
+        self.collapse_duplicates = collapse_duplicates
+        self.duplicate_detector = (
+            near_duplicates.NearDuplicateDetector(near_duplicates.load_common_shingles())
+            if detect_duplicates or collapse_duplicates else None
+        )
+        self.duplicates = {}
 
-    def get_inverted_index(self):
+    @staticmethod
+    def iter_documents():
         for root, _, files in os.walk(FILES_PATH):
             for index, file in enumerate(sorted(files), 1):
-                lemmatisator = lemmatisation.Lemmatisator()
-                lemmatisator.run_lemmatization(
-                    lemmatisation.get_text_from_html(os.path.join(root, file))
-                )
-                for lemma in lemmatisator.lemmas.keys():
-                    self.inverted_index[lemma].append(index)
+                yield index, os.path.join(root, file)
+
+    def get_inverted_index(self):
+        for index, path in self.iter_documents():
+            lemmatisator = lemmatisation.Lemmatisator()
+            with open(path, encoding="utf-8") as f:
+                soup = BeautifulSoup(f.read(), features="html.parser")
+            lemmatisator.run_lemmatization(" ".join(soup.stripped_strings))
+            if self.is_duplicate(path, soup, lemmatisator) and self.collapse_duplicates:
+                continue
+            for lemma in lemmatisator.lemmas.keys():
+                self.inverted_index[lemma].append(index)
+            self.postings_in_memory += len(lemmatisator.lemmas)
+            if self.max_postings and self.postings_in_memory >= self.max_postings:
+                self.flush_run()
+
+    def is_duplicate(self, path, soup, lemmatisator):
+        if self.duplicate_detector is None or not path.endswith(".html"):
+            return False
+        name = os.path.basename(path)
+        terms = near_duplicates.indexed_terms(near_duplicates.main_text(soup), lemmatisator)
+        canonical = self.duplicate_detector.add(name, terms)
+        if canonical is None:
+            return False
+        self.duplicates[name] = canonical
+        return True
+
+    def flush_run(self):
+        """Сбрасывает накопленную часть индекса на диск отсортированной по словам"""
+        self.runs.append(self.write_run(
+            (word, self.inverted_index[word]) for word in sorted(self.inverted_index)
+        ))
+        self.inverted_index = defaultdict(list)
+        self.postings_in_memory = 0
+
+    def write_run(self, entries):
+        os.makedirs(RUNS_PATH, exist_ok=True)
+        path = os.path.join(RUNS_PATH, f"run_{self.run_count}.txt")
+        self.run_count += 1
+        with open(path, "w", encoding="UTF-8") as file:
+            for word, inverted_array in entries:
+                file.write(json.dumps([word, inverted_array], ensure_ascii=False) + "\n")
+        return path
+
+    @staticmethod
+    def read_run(path):
+        with open(path, encoding="UTF-8") as file:
+            for line in file:
+                yield json.loads(line)
+
+    def merge_group(self, paths):
+        # Прогоны идут в порядке документов, а heapq.merge при равных словах
+        # сохраняет порядок прогонов, поэтому списки документов остаются отсортированными
+        runs = heapq.merge(*(self.read_run(path) for path in paths), key=lambda entry: entry[0])
+        for word, entries in groupby(runs, key=lambda entry: entry[0]):
+            yield word, [index for _, inverted_array in entries for index in inverted_array]
+
+    def merge_runs(self):
+        """Сливает прогоны, открывая одновременно не больше MERGE_FAN_IN файлов"""
+        while len(self.runs) > MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(self.runs), MERGE_FAN_IN):
+                group = self.runs[start:start + MERGE_FAN_IN]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                merged.append(self.write_run(self.merge_group(group)))
+                for path in group:
+                    os.remove(path)
+            self.runs = merged
+        return self.merge_group(self.runs)
 
     def write_inverted_index(self, path):
+        if self.runs:
+            if self.inverted_index:
+                self.flush_run()
+            entries = self.merge_runs()
+        else:
+            entries = self.inverted_index.items()
+
         with open(path, "w", encoding="UTF-8") as file:
-            for word, inverted_array in self.inverted_index.items():
+            for word, inverted_array in entries:
                 file.write(
                     str(
                         {
@@ -44,8 +145,15 @@ class IndexInverter:
                     + "\n"
                 )
 
+        if self.runs:
+            shutil.rmtree(RUNS_PATH)
+            self.runs = []
+
 
 if __name__ == "__main__":
-    inverted_index = IndexInverter()
+    # duplicates.txt пишет отдельный проход near_duplicates.py
+    inverted_index = IndexInverter(max_postings=MAX_POSTINGS_IN_MEMORY)
     inverted_index.get_inverted_index()
-    inverted_index.write_inverted_index(INVERTED_INDEX_PATH)
\ No newline at end of file
+    inverted_index.write_inverted_index(INVERTED_INDEX_PATH)
+    if os.path.exists(link_graph.LINK_GRAPH_PATH):
+        link_graph.build_static_rank()
@@ -0,0 +1,134 @@
+import math
+import os
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+URLS_PATH = "urls.txt"
+PAGES_DIR = "downloaded_pages"
+LINK_GRAPH_PATH = "link_graph.txt"
+PAGERANK_PATH = "pagerank.txt"
+
+DAMPING = 0.85
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 100
+
+
+def write_link_graph(
+        urls: Dict[int, str],
+        outlinks: Dict[str, Iterable[str]],
+        path: str = LINK_GRAPH_PATH
+) -> None:
+    """Сохраняет граф ссылок между проиндексированными страницами.
+
+    Номер страницы — тот же, что у page_N.html, каждая строка: номер
+    страницы и номера страниц, на которые она ссылается.
+    """
+    doc_ids = {url: doc_id for doc_id, url in urls.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        for url, doc_id in doc_ids.items():
+            targets = sorted({
+                doc_ids[link] for link in outlinks.get(url, ())
+                if link in doc_ids and doc_ids[link] != doc_id
+            })
+            f.write(" ".join(map(str, [doc_id, *targets])) + "\n")
+
+
+def extract_link_graph(path: str = LINK_GRAPH_PATH) -> None:
+    """Строит граф ссылок по уже скачанным страницам"""
+    from bs4 import BeautifulSoup
+    from generate_urls import get_links
+
+    # Страницы нумеруются по позиции в urls.txt, как при скачивании
+    with open(URLS_PATH, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    urls = {}
+    outlinks = {}
+    for doc_id, url in enumerate(lines, start=1):
+        page_path = os.path.join(PAGES_DIR, f"page_{doc_id}.html")
+        if not os.path.exists(page_path):
+            continue
+        urls[doc_id] = url
+        with open(page_path, encoding="utf-8") as f:
+            outlinks[url] = get_links(BeautifulSoup(f.read(), "html.parser"), url)
+
+    write_link_graph(urls, outlinks, path)
+
+
+def load_link_graph(path: str = LINK_GRAPH_PATH) -> Dict[int, List[int]]:
+    graph = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            ids = [int(x) for x in line.split()]
+            if ids:
+                graph[ids[0]] = ids[1:]
+    return graph
+
+
+def pagerank(graph: Dict[int, List[int]], damping: float = DAMPING) -> np.ndarray:
+    """PageRank степенным методом; результат индексируется номером страницы"""
+    size = max(graph) + 1
+    sources = np.array([src for src, targets in graph.items() for _ in targets], dtype=np.int64)
+    targets = np.array([dst for targets in graph.values() for dst in targets], dtype=np.int64)
+    out_degree = np.bincount(sources, minlength=size).astype(np.float64)
+
+    nodes = np.zeros(size, dtype=bool)
+    nodes[list(graph)] = True
+    nodes_count = nodes.sum()
+    dangling = nodes & (out_degree == 0)
+
+    rank = np.where(nodes, 1.0 / nodes_count, 0.0)
+    weights = np.zeros(len(sources))
+    for _ in range(MAX_ITERATIONS):
+        np.divide(rank[sources], out_degree[sources], out=weights)
+        spread = np.bincount(targets, weights=weights, minlength=size)
+        teleport = (1 - damping + damping * rank[dangling].sum()) / nodes_count
+        new_rank = np.where(nodes, damping * spread + teleport, 0.0)
+        converged = np.abs(new_rank - rank).sum() < TOLERANCE
+        rank = new_rank
+        if converged:
+            break
+
+    return rank
+
+
+def write_pagerank(rank: np.ndarray, path: str = PAGERANK_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for doc_id in np.flatnonzero(rank):
+            f.write(f"{doc_id} {rank[doc_id]}\n")
+
+
+def load_pagerank(path: str = PAGERANK_PATH) -> List[float]:
+    """Загружает PageRank как список по номеру страницы.
+
+    Значения переводятся в логарифмическую шкалу и нормируются в [0, 1]:
+    PageRank распределен по степенному закону, и без логарифма почти все
+    страницы получили бы близкий к нулю вес.
+    """
+    if not os.path.exists(path):
+        return []
+    scores = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            doc_id, score = line.split()
+            scores[int(doc_id)] = float(score)
+    if not scores:
+        return []
+    low = math.log(min(scores.values()))
+    spread = math.log(max(scores.values())) - low
+    rank = [0.0] * (max(scores) + 1)
+    for doc_id, score in scores.items():
+        rank[doc_id] = (math.log(score) - low) / spread if spread > 0 else 1.0
+    return rank
+
+
+def build_static_rank(path: str = LINK_GRAPH_PATH) -> None:
+    rank = pagerank(load_link_graph(path))
+    write_pagerank(rank)
+
+
+if __name__ == "__main__":
+    if not os.path.exists(LINK_GRAPH_PATH):
+        extract_link_graph()
+    build_static_rank()
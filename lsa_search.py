@@ -0,0 +1,136 @@
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from task5_search import load_lemmas, load_tfidf_data, process_query
+
+LSA_DIR = 'lsa/'
+DOC_VECTORS_FILE = 'doc_vectors.npy'
+TERM_VECTORS_FILE = 'term_vectors.npy'
+TERMS_FILE = 'terms.txt'
+DOCS_FILE = 'docs.txt'
+
+LSA_RANK = 100
+OVERSAMPLING = 10
+POWER_ITERATIONS = 4
+SEED = 42
+TOP_N = 10
+
+
+def randomized_svd(matrix: np.ndarray, rank: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Усеченное SVD рандомизированным методом (Halko, Martinsson, Tropp)"""
+    rng = np.random.default_rng(SEED)
+    sample = min(rank + OVERSAMPLING, min(matrix.shape))
+    basis = matrix @ rng.standard_normal((matrix.shape[1], sample)).astype(matrix.dtype)
+    basis, _ = np.linalg.qr(basis)
+    for _ in range(POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(matrix.T @ basis)
+        basis, _ = np.linalg.qr(matrix @ basis)
+
+    u, s, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+    return (basis @ u)[:, :rank], s[:rank], vt[:rank]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def build_lsa(rank: int = LSA_RANK, directory: str = LSA_DIR) -> None:
+    """Раскладывает матрицу документ×терм TF-IDF и сохраняет плотные векторы"""
+    doc_tfidf, _ = load_tfidf_data()
+    docs = sorted(doc_tfidf, key=lambda name: int(name.replace('page_', '').replace('.txt', '')))
+    terms = sorted({lemma for lemmas in doc_tfidf.values() for lemma in lemmas})
+    term_ids = {term: i for i, term in enumerate(terms)}
+
+    matrix = np.zeros((len(docs), len(terms)), dtype=np.float32)
+    for row, doc_name in enumerate(docs):
+        for lemma, tfidf in doc_tfidf[doc_name].items():
+            matrix[row, term_ids[lemma]] = tfidf
+
+    u, s, vt = randomized_svd(matrix, min(rank, *matrix.shape))
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, DOC_VECTORS_FILE), normalize_rows(u * s).astype(np.float32))
+    np.save(os.path.join(directory, TERM_VECTORS_FILE), vt.T.astype(np.float32))
+    with open(os.path.join(directory, TERMS_FILE), 'w', encoding='utf-8') as f:
+        f.write("\n".join(terms))
+    with open(os.path.join(directory, DOCS_FILE), 'w', encoding='utf-8') as f:
+        f.write("\n".join(name.replace('page_', '').replace('.txt', '') for name in docs))
+
+
+class LatentSemanticSearch:
+    """Поиск в латентном пространстве: запрос проецируется на те же оси, что и документы"""
+
+    def __init__(self, directory: str = LSA_DIR) -> None:
+        self.doc_vectors = np.load(os.path.join(directory, DOC_VECTORS_FILE), mmap_mode='r')
+        self.term_vectors = np.load(os.path.join(directory, TERM_VECTORS_FILE), mmap_mode='r')
+        with open(os.path.join(directory, TERMS_FILE), 'r', encoding='utf-8') as f:
+            self.term_ids = {term: i for i, term in enumerate(f.read().split("\n"))}
+        with open(os.path.join(directory, DOCS_FILE), 'r', encoding='utf-8') as f:
+            self.doc_ids = f.read().split("\n")
+        self.doc_rows = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+
+    def query_vectors(self, queries: List[List[str]]) -> np.ndarray:
+        vectors = np.zeros((len(queries), self.term_vectors.shape[1]), dtype=np.float32)
+        for i, query_lemmas in enumerate(queries):
+            rows = [self.term_ids[lemma] for lemma in set(query_lemmas) if lemma in self.term_ids]
+            if rows:
+                vectors[i] = self.term_vectors[rows].sum(axis=0)
+        return normalize_rows(vectors)
+
+    def top(self, scores: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+        top_n = min(top_n, len(scores))
+        best = np.argpartition(-scores, top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[best])]
+        return [(self.doc_ids[row], float(scores[row])) for row in best if scores[row] > 0]
+
+    def search_many(self, queries: List[List[str]], top_n: int = TOP_N) -> List[List[Tuple[str, float]]]:
+        """Оценивает все запросы одним матричным произведением"""
+        scores = self.query_vectors(queries) @ self.doc_vectors.T
+        return [self.top(row, top_n) for row in scores]
+
+    def search(self, query_lemmas: List[str], top_n: int = TOP_N) -> List[Tuple[str, float]]:
+        return self.search_many([query_lemmas], top_n)[0]
+
+    def similar_documents(self, doc_id: str, top_n: int = TOP_N) -> List[Tuple[str, float]]:
+        if doc_id not in self.doc_rows:
+            return []
+        row = self.doc_rows[doc_id]
+        scores = self.doc_vectors @ self.doc_vectors[row]
+        scores[row] = -np.inf
+        return self.top(scores, top_n)
+
+
+def main():
+    if not os.path.exists(LSA_DIR):
+        print("Построение латентного пространства...")
+        build_lsa()
+
+    lemmas = load_lemmas()
+    engine = LatentSemanticSearch()
+    print("Поисковая система готова к работе. Вводите запросы, '#N' — документы, похожие на N.")
+
+    while True:
+        query = input("\nПоисковый запрос (или 'q' для выхода): ").strip()
+        if query.lower() == 'q':
+            break
+
+        if query.startswith('#'):
+            results = engine.similar_documents(query[1:].strip())
+        else:
+            query_lemmas = process_query(query, lemmas)
+            if not query_lemmas:
+                print("Не найдено подходящих лемм для запроса.")
+                continue
+            results = engine.search(query_lemmas)
+
+        if not results:
+            print("Ничего не найдено.")
+        for doc_id, score in results:
+            print(f"Документ {doc_id}: {score:.6f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import os
+import random
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from bs4 import BeautifulSoup
+
+DUPLICATES_PATH = "duplicates.txt"
+COMMON_SHINGLES_PATH = "common_shingles.txt"
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+# На текущем корпусе после удаления общих шинглов настоящие копии
+# (две версии статьи «Сёрфинг») имеют Jaccard 0.82, а разные страницы — не выше 0.58
+JACCARD_THRESHOLD = 0.7
+# Шинглы, встречающиеся в большей доле документов, считаются шаблоном сайта
+COMMON_SHINGLE_RATIO = 0.02
+MIN_COMMON_SHINGLE_DF = 3
+SEED = 42
+
+BOILERPLATE_TAGS = {"header", "footer", "nav", "aside", "script", "style", "noscript", "form"}
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def main_text(soup) -> str:
+    """Текст основного содержимого страницы без шапки, меню и подвала"""
+    root = soup.find("main") or soup.body or soup
+    return " ".join(
+        string.strip() for string in root.find_all(string=True)
+        if string.strip() and not any(parent.name in BOILERPLATE_TAGS for parent in string.parents)
+    )
+
+
+def main_text_from_html(file_path: str) -> str:
+    with open(file_path, encoding="utf-8") as f:
+        return main_text(BeautifulSoup(f.read(), features="html.parser"))
+
+
+def page_terms(text: str, lemmatisator) -> List[str]:
+    """Последовательность лемм текста с той же фильтрацией токенов, что и в индексе.
+
+    Разбирает токены напрямую, не накапливая их в атрибутах лемматизатора.
+    """
+    terms = []
+    token_lemmas = {}
+    for token in lemmatisator.tokenizer.tokenize(text):
+        if token not in token_lemmas:
+            morph = lemmatisator.morph_analyzer.parse(token)[0]
+            is_good = lemmatisator.filter_reason(token, morph) is None
+            token_lemmas[token] = morph.normal_form if is_good else None
+        if token_lemmas[token] is not None:
+            terms.append(token_lemmas[token])
+    return terms
+
+
+def indexed_terms(text: str, lemmatisator) -> List[str]:
+    """То же, что page_terms, но по уже лемматизированной странице.
+
+    Леммы берутся из lemmatisator.lemmas, поэтому токены не разбираются повторно;
+    токены, не попавшие в леммы, были отброшены фильтром.
+    """
+    token_lemmas = {token: lemma for lemma, tokens in lemmatisator.lemmas.items() for token in tokens}
+    return [
+        token_lemmas[token] for token in lemmatisator.tokenizer.tokenize(text)
+        if token in token_lemmas
+    ]
+
+
+def shingles(terms: Sequence[str], size: int = SHINGLE_SIZE) -> Set[str]:
+    if len(terms) < size:
+        return {" ".join(terms)} if terms else set()
+    return {" ".join(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+
+def shingle_hashes(terms: Sequence[str]) -> Set[int]:
+    return {zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(terms)}
+
+
+def common_shingles(documents: Iterable[Set[int]]) -> Set[int]:
+    """Шинглы, которые встречаются во многих документах (шаблон сайта)"""
+    df = Counter()
+    count = 0
+    for hashes in documents:
+        df.update(hashes)
+        count += 1
+    limit = max(MIN_COMMON_SHINGLE_DF, COMMON_SHINGLE_RATIO * count)
+    return {shingle for shingle, value in df.items() if value > limit}
+
+
+class MinHash:
+    def __init__(self, num_perm: int = NUM_PERMUTATIONS, seed: int = SEED) -> None:
+        generator = random.Random(seed)
+        self.num_perm = num_perm
+        self.permutations = [
+            (generator.randint(1, MERSENNE_PRIME - 1), generator.randint(0, MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, hashes: Set[int]) -> Tuple[int, ...]:
+        return tuple(
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def jaccard(first: Sequence[int], second: Sequence[int]) -> float:
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class LSHIndex:
+    def __init__(self, bands: int = LSH_BANDS, rows: int = NUM_PERMUTATIONS // LSH_BANDS) -> None:
+        self.bands = bands
+        self.rows = rows
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+
+    def _band_keys(self, signature: Sequence[int]):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key: Hashable, signature: Sequence[int]) -> None:
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band][band_key].append(key)
+
+    def candidates(self, signature: Sequence[int]) -> Set[Hashable]:
+        result = set()
+        for band, band_key in self._band_keys(signature):
+            result.update(self.buckets[band].get(band_key, ()))
+        return result
+
+
+class NearDuplicateDetector:
+    """Находит почти-дубликаты документов по MinHash-подписям шинглов лемм.
+
+    Шинглы из common (шаблон сайта, см. common_shingles) в подпись не входят.
+    В индекс LSH попадают только канонические документы, поэтому дубликат
+    всегда сворачивается к первому встреченному экземпляру.
+    """
+
+    def __init__(
+            self,
+            common: Optional[Set[int]] = None,
+            threshold: float = JACCARD_THRESHOLD,
+            num_perm: int = NUM_PERMUTATIONS,
+            bands: int = LSH_BANDS
+    ) -> None:
+        self.common = common or set()
+        self.threshold = threshold
+        self.minhash = MinHash(num_perm)
+        self.lsh = LSHIndex(bands, num_perm // bands)
+        self.signatures = {}
+
+    def find_duplicate(self, signature: Sequence[int]) -> Optional[Hashable]:
+        best_key, best_similarity = None, self.threshold
+        for key in self.lsh.candidates(signature):
+            similarity = MinHash.jaccard(signature, self.signatures[key])
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def add(self, key: Hashable, terms: Sequence[str]) -> Optional[Hashable]:
+        """Возвращает канонический документ, если key — почти-дубликат, иначе запоминает key"""
+        return self.add_hashes(key, shingle_hashes(terms))
+
+    def add_hashes(self, key: Hashable, hashes: Set[int]) -> Optional[Hashable]:
+        hashes = hashes - self.common
+        if not hashes:
+            # Страница из одного шаблона: сравнивать нечего
+            return None
+        signature = self.minhash.signature(hashes)
+        canonical = self.find_duplicate(signature)
+        if canonical is None:
+            self.signatures[key] = signature
+            self.lsh.add(key, signature)
+        return canonical
+
+
+def write_duplicates(duplicates: Dict[str, str], path: str = DUPLICATES_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for duplicate, canonical in duplicates.items():
+            f.write(f"{duplicate} {canonical}\n")
+
+
+def load_duplicates(path: str = DUPLICATES_PATH) -> Dict[str, str]:
+    duplicates = {}
+    if not os.path.exists(path):
+        return duplicates
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2:
+                duplicates[parts[0]] = parts[1]
+    return duplicates
+
+
+def write_common_shingles(common: Set[int], path: str = COMMON_SHINGLES_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(map(str, sorted(common))))
+
+
+def load_common_shingles(path: str = COMMON_SHINGLES_PATH) -> Set[int]:
+    """Шаблон сайта, найденный при разборе уже скачанного корпуса, для однопроходных режимов.
+
+    Без него шапка и меню сайта делают почти-дубликатами треть страниц,
+    поэтому отсутствие файла — ошибка, а не пустой шаблон.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} не найден, сначала запустите near_duplicates.py")
+    with open(path, encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip()}
+
+
+if __name__ == "__main__":
+    from index_search import IndexInverter, lemmatisation
+
+    lemmatisator = lemmatisation.Lemmatisator()
+    documents = {}
+    for _, path in IndexInverter.iter_documents():
+        if path.endswith(".html"):
+            text = main_text_from_html(path)
+            documents[os.path.basename(path)] = shingle_hashes(page_terms(text, lemmatisator))
+
+    # Второй проход: шаблон сайта известен по всему корпусу до построения подписей
+    common = common_shingles(documents.values())
+    detector = NearDuplicateDetector(common)
+    duplicates = {}
+    for name, hashes in documents.items():
+        canonical = detector.add_hashes(name, hashes)
+        if canonical is not None:
+            duplicates[name] = canonical
+            print(f"{name} is a near-duplicate of {canonical}")
+
+    write_common_shingles(common)
+    write_duplicates(duplicates)
+    print(f"Near-duplicates found: {len(duplicates)}")
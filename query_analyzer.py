@@ -0,0 +1,48 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+CACHE_SIZE = 100_000
+
+_lemmatisator = None
+_lemmatisator_lock = threading.Lock()
+
+
+def get_lemmatisator():
+    """Лемматизатор создается при первом незнакомом слове, а не при запуске процесса"""
+    global _lemmatisator
+    if _lemmatisator is None:
+        with _lemmatisator_lock:
+            if _lemmatisator is None:
+                from index_search import lemmatisation
+                _lemmatisator = lemmatisation.Lemmatisator()
+    return _lemmatisator
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(word: str):
+    return get_lemmatisator().morph_analyzer.parse(word)[0]
+
+
+def normal_form(word: str) -> str:
+    return parse(word).normal_form
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def analyze_word(word: str) -> Optional[str]:
+    """Лемма слова с той же фильтрацией, что и при построении индекса"""
+    morph = parse(word)
+    if get_lemmatisator().filter_reason(word, morph) is not None:
+        return None
+    return morph.normal_form
+
+
+def analyze_query(query: str, lemmas: Dict[str, str]) -> List[str]:
+    """Сначала ищет слово в таблице лемм корпуса, затем разбирает его pymorphy2"""
+    result = []
+    for word in re.findall(r'\w+', query.lower()):
+        lemma = lemmas[word] if word in lemmas else analyze_word(word)
+        if lemma is not None:
+            result.append(lemma)
+    return result
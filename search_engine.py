@@ -0,0 +1,105 @@
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import generations
+from link_graph import load_pagerank
+from task5_search import (
+    load_inverted_index, load_lemmas, load_tfidf_data, process_query, rank_documents,
+    relevant_documents, search
+)
+
+POLL_INTERVAL = 2.0
+TOP_N = 10
+
+
+class SearchEngine:
+    """Все данные одного поколения индекса, загруженные в память"""
+
+    def __init__(self, directory: str = ".", generation: Optional[str] = None) -> None:
+        self.generation = generation
+        self.lemmas = load_lemmas(os.path.join(directory, "lemmas.txt"))
+        self.index = load_inverted_index(os.path.join(directory, "inverted_index.txt"))
+        self.doc_tfidf, self.doc_lengths = load_tfidf_data(os.path.join(directory, "lemmas_tf_idf"))
+        self.pagerank = load_pagerank(os.path.join(directory, "pagerank.txt"))
+
+    @classmethod
+    def load_current(cls) -> "SearchEngine":
+        generation = generations.current_generation()
+        if generation is None:
+            return cls()
+        return cls(generations.generation_path(generation), generation)
+
+    def is_loaded(self) -> bool:
+        return bool(self.lemmas and self.index and self.doc_tfidf)
+
+    def process_query(self, query: str) -> List[str]:
+        return process_query(query, self.lemmas)
+
+    def search(self, query_lemmas: List[str], top_n: int = TOP_N) -> List[Tuple[str, float]]:
+        return search(query_lemmas, self.index, self.doc_tfidf, self.doc_lengths, self.pagerank)[:top_n]
+
+    def search_many(self, queries: List[str], top_n: int = TOP_N) -> List[List[Tuple[str, float]]]:
+        """Обрабатывает пачку запросов: одинаковые запросы и списки документов
+        общих лемм разбираются один раз на всю пачку"""
+        postings = {}
+        answers = {}
+        results = []
+        for query in queries:
+            if query not in answers:
+                query_lemmas = self.process_query(query)
+                relevant_docs = set()
+                for lemma in query_lemmas:
+                    if lemma not in postings:
+                        postings[lemma] = relevant_documents(lemma, self.index)
+                    relevant_docs |= postings[lemma]
+                answers[query] = rank_documents(
+                    query_lemmas, relevant_docs, self.doc_tfidf, self.doc_lengths, self.pagerank
+                )[:top_n]
+            results.append(answers[query])
+        return results
+
+
+class EngineHolder:
+    """Ссылка на текущий движок.
+
+    Запрос берет holder.engine один раз и работает с ним до конца, поэтому
+    замена ссылки не затрагивает уже начатые запросы, а старое поколение
+    освобождается, когда последний из них завершится.
+    """
+
+    def __init__(self, engine: SearchEngine) -> None:
+        self.engine = engine
+
+
+class EngineWatcher(threading.Thread):
+    """Следит за generations/CURRENT и подгружает новое поколение в фоне"""
+
+    def __init__(self, holder: EngineHolder, interval: float = POLL_INTERVAL) -> None:
+        super().__init__(daemon=True)
+        self.holder = holder
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.failed_generation = None
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            generation = generations.current_generation()
+            if generation in (None, self.holder.engine.generation, self.failed_generation):
+                continue
+            try:
+                engine = SearchEngine(generations.generation_path(generation), generation)
+            except Exception as e:
+                # Поток должен пережить битое поколение и дождаться следующего
+                print(f"Ошибка загрузки поколения {generation}: {e}, остается текущее")
+                self.failed_generation = generation
+                continue
+            if not engine.is_loaded():
+                print(f"Ошибка: поколение {generation} загружено не полностью, остается текущее")
+                self.failed_generation = generation
+                continue
+            self.holder.engine = engine
+            print(f"Загружено поколение индекса {generation}")
+
+    def stop(self) -> None:
+        self.stopped.set()
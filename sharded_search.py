@@ -0,0 +1,192 @@
+import heapq
+import json
+import math
+import os
+import re
+from collections import defaultdict
+from multiprocessing import Pipe, Process
+from typing import Dict, List, Tuple
+
+from link_graph import load_pagerank
+from task5_search import load_inverted_index, load_lemmas, process_query, ranking_key, search
+
+TFIDF_DIR = 'lemmas_tf_idf/'
+SHARDS_DIR = 'shards'
+SHARDS_COUNT = 4
+TOP_N = 10
+
+
+def shard_dir(shard: int) -> str:
+    return os.path.join(SHARDS_DIR, f'shard_{shard}')
+
+
+def doc_shard(doc_id: int, shards_count: int) -> int:
+    return doc_id % shards_count
+
+
+def build_shards(shards_count: int = SHARDS_COUNT) -> None:
+    """Делит документы на шарды: у каждого свой индекс, tf документов и df термов"""
+    from index_search import IndexInverter
+
+    index = load_inverted_index()
+    postings = [defaultdict(list) for _ in range(shards_count)]
+    for word, doc_ids in index.items():
+        for doc_id in doc_ids:
+            postings[doc_shard(doc_id, shards_count)][word].append(doc_id)
+
+    # N считается так же, как при построении индекса: по всем пронумерованным файлам
+    documents = [0] * shards_count
+    for doc_id, _ in IndexInverter.iter_documents():
+        documents[doc_shard(doc_id, shards_count)] += 1
+
+    df = [{word: len(doc_ids) for word, doc_ids in postings[shard].items()} for shard in range(shards_count)]
+    for shard, filename, rows in read_tfidf_files(shards_count):
+        for word, _ in rows:
+            # Леммы без списка документов в индексе найти нельзя, но они входят в длину вектора
+            if word not in index:
+                df[shard][word] = df[shard].get(word, 0) + 1
+
+    for shard in range(shards_count):
+        os.makedirs(os.path.join(shard_dir(shard), 'tf'), exist_ok=True)
+        with open(os.path.join(shard_dir(shard), 'inverted_index.txt'), 'w', encoding='utf-8') as f:
+            for word, doc_ids in postings[shard].items():
+                f.write(json.dumps({"count": len(doc_ids), "inverted_array": doc_ids, "word": word},
+                                   ensure_ascii=False) + "\n")
+        stats = {"documents": documents[shard], "df": df[shard]}
+        with open(os.path.join(shard_dir(shard), 'stats.json'), 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False)
+
+    # tf записывается относительно сведенного idf, а не idf из lemmas_tf_idf:
+    # там idf одной леммы в разных файлах расходится, а веса документов
+    # в шардах должны совпасть с весами единого индекса
+    idf = global_idf(shards_count)
+    for shard, filename, rows in read_tfidf_files(shards_count):
+        with open(os.path.join(shard_dir(shard), 'tf', filename), 'w', encoding='utf-8') as f:
+            for word, tfidf in rows:
+                f.write(f"{word} {tfidf / idf[word] if idf[word] else 0.0}\n")
+
+
+def read_tfidf_files(shards_count: int):
+    for filename in os.listdir(TFIDF_DIR):
+        match = re.fullmatch(r'page_(\d+)\.txt', filename)
+        if not match:
+            continue
+        rows = []
+        with open(os.path.join(TFIDF_DIR, filename), 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.strip().split()
+                if len(parts) >= 3:
+                    rows.append((parts[0], float(parts[2])))
+        yield doc_shard(int(match.group(1)), shards_count), filename, rows
+
+
+def global_idf(shards_count: int) -> Dict[str, float]:
+    """Сводит df шардов в глобальный idf, как если бы индекс был один"""
+    total_documents = 0
+    df = defaultdict(int)
+    for shard in range(shards_count):
+        with open(os.path.join(shard_dir(shard), 'stats.json'), 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        total_documents += stats["documents"]
+        for word, count in stats["df"].items():
+            df[word] += count
+    return {word: math.log(total_documents / count) for word, count in df.items()}
+
+
+def load_shard(shard: int, idf: Dict[str, float]):
+    index = {}
+    with open(os.path.join(shard_dir(shard), 'inverted_index.txt'), 'r', encoding='utf-8') as f:
+        for line in f:
+            data = json.loads(line)
+            index[data['word']] = data['inverted_array']
+
+    doc_tfidf = defaultdict(dict)
+    doc_lengths = {}
+    tf_dir = os.path.join(shard_dir(shard), 'tf')
+    for filename in os.listdir(tf_dir):
+        with open(os.path.join(tf_dir, filename), 'r', encoding='utf-8') as f:
+            for line in f:
+                lemma, tf = line.split()
+                doc_tfidf[filename][lemma] = float(tf) * idf.get(lemma, 0.0)
+        length = math.sqrt(sum(tfidf ** 2 for tfidf in doc_tfidf[filename].values()))
+        doc_lengths[filename] = length if length != 0 else 1.0
+
+    return index, dict(doc_tfidf), doc_lengths
+
+
+def shard_worker(shard: int, idf: Dict[str, float], connection) -> None:
+    index, doc_tfidf, doc_lengths = load_shard(shard, idf)
+    # Тот же статический ранг, что и в едином индексе
+    pagerank = load_pagerank()
+    connection.send("ready")
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        query_lemmas, top_n = message
+        connection.send(search(query_lemmas, index, doc_tfidf, doc_lengths, pagerank)[:top_n])
+    connection.close()
+
+
+class ShardedSearch:
+    """Координатор: рассылает запрос процессам шардов и сливает их top-k"""
+
+    def __init__(self, shards_count: int = SHARDS_COUNT) -> None:
+        idf = global_idf(shards_count)
+        self.connections = []
+        self.workers = []
+        for shard in range(shards_count):
+            parent, child = Pipe()
+            worker = Process(target=shard_worker, args=(shard, idf, child), daemon=True)
+            worker.start()
+            self.connections.append(parent)
+            self.workers.append(worker)
+        for connection in self.connections:
+            connection.recv()
+
+    def search(self, query_lemmas: List[str], top_n: int = TOP_N) -> List[Tuple[str, float]]:
+        for connection in self.connections:
+            connection.send((query_lemmas, top_n))
+        results = []
+        for connection in self.connections:
+            results.extend(connection.recv())
+        return heapq.nsmallest(top_n, results, key=ranking_key)
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(None)
+        for worker in self.workers:
+            worker.join()
+
+
+def main():
+    if not os.path.exists(SHARDS_DIR):
+        print("Построение шардов...")
+        build_shards()
+
+    lemmas = load_lemmas()
+    engine = ShardedSearch()
+    print("Поисковая система готова к работе. Вводите запросы.")
+
+    try:
+        while True:
+            query = input("\nПоисковый запрос (или 'q' для выхода): ").strip()
+            if query.lower() == 'q':
+                break
+
+            query_lemmas = process_query(query, lemmas)
+            if not query_lemmas:
+                print("Не найдено подходящих лемм для запроса.")
+                continue
+
+            results = engine.search(query_lemmas)
+            if not results:
+                print("Ничего не найдено.")
+            for doc_id, score in results:
+                print(f"Документ {doc_id}: {score:.6f}")
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
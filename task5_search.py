@@ -1,20 +1,24 @@
 import json
 import math
 import os
-import re
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from link_graph import load_pagerank
+from query_analyzer import analyze_query
 
 
 LEMMAS_FILE = 'lemmas.txt'
 INVERTED_INDEX_FILE = 'inverted_index.txt'
 TFIDF_DIR = 'lemmas_tf_idf/'
+# Наибольшая относительная прибавка к косинусу у страницы с максимальным PageRank
+PAGERANK_WEIGHT = 0.2
 
 
-def load_lemmas() -> Dict[str, str]:
+def load_lemmas(path: str = LEMMAS_FILE) -> Dict[str, str]:
     lemmas = {}
     try:
-        with open(LEMMAS_FILE, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             for line in f:
                 parts = line.strip().split()
                 if not parts:
@@ -24,37 +28,37 @@ def load_lemmas() -> Dict[str, str]:
                     lemmas[word] = lemma
         return lemmas
     except FileNotFoundError:
-        print(f"Ошибка: Файл {LEMMAS_FILE} не найден!")
+        print(f"Ошибка: Файл {path} не найден!")
         return {}
 
 
-def load_inverted_index() -> Dict[str, List[int]]:
+def load_inverted_index(path: str = INVERTED_INDEX_FILE) -> Dict[str, List[int]]:
     """Загружает обратный индекс"""
     index = {}
     try:
-        with open(INVERTED_INDEX_FILE, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             for line in f:
                 data = json.loads(line)
                 index[data['word']] = data['inverted_array']
         return index
     except FileNotFoundError:
-        print(f"Ошибка: Файл {INVERTED_INDEX_FILE} не найден!")
+        print(f"Ошибка: Файл {path} не найден!")
         return {}
 
 
-def load_tfidf_data() -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+def load_tfidf_data(directory: str = TFIDF_DIR) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
     doc_tfidf = defaultdict(dict)
     doc_lengths = {}
 
-    if not os.path.exists(TFIDF_DIR):
-        print(f"Ошибка: Директория {TFIDF_DIR} не найдена!")
+    if not os.path.exists(directory):
+        print(f"Ошибка: Директория {directory} не найдена!")
         return {}, {}
 
-    for filename in os.listdir(TFIDF_DIR):
+    for filename in os.listdir(directory):
         if not filename.endswith('.txt'):
             continue
 
-        filepath = os.path.join(TFIDF_DIR, filename)
+        filepath = os.path.join(directory, filename)
         with open(filepath, 'r', encoding='utf-8') as f:
             for line in f:
                 parts = line.strip().split()
@@ -72,23 +76,27 @@ def load_tfidf_data() -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
 
 
 def process_query(query: str, lemmas: Dict[str, str]) -> List[str]:
-    words = re.findall(r'\w+', query.lower())
-    return [lemmas[word] for word in words if word in lemmas]
+    return analyze_query(query, lemmas)
 
 
-def search(
+def relevant_documents(lemma: str, index: Dict[str, List[int]]) -> Set[str]:
+    return {f"page_{doc_id}.txt" for doc_id in index.get(lemma, ())}
+
+
+def ranking_key(result: Tuple[str, float]) -> Tuple[float, int]:
+    # При равной оценке порядок задает номер документа, а не порядок обхода множества
+    doc_id, score = result
+    return -score, int(doc_id)
+
+
+def rank_documents(
         query_lemmas: List[str],
-        index: Dict[str, List[int]],
+        relevant_docs: Iterable[str],
         doc_tfidf: Dict[str, Dict[str, float]],
-        doc_lengths: Dict[str, float]
+        doc_lengths: Dict[str, float],
+        pagerank: Optional[List[float]] = None,
+        pagerank_weight: float = PAGERANK_WEIGHT
 ) -> List[Tuple[str, float]]:
-    relevant_docs = set()
-    for lemma in query_lemmas:
-        if lemma in index:
-            for doc_id in index[lemma]:
-                doc_name = f"page_{doc_id}.txt"
-                relevant_docs.add(doc_name)
-
     query_vector = {lemma: 1 for lemma in set(query_lemmas)}
     query_length = math.sqrt(len(query_vector))
 
@@ -109,9 +117,30 @@ def search(
 
         cosine_similarity = dot_product / denominator
         doc_id = doc_name.replace('page_', '').replace('.txt', '')
+        if pagerank:
+            # Статический ранг посчитан заранее, при запросе это один доступ по индексу.
+            # Он масштабирует косинус, а не складывается с ним: нерелевантная
+            # страница не обгонит релевантную только за счет ссылок
+            static_rank = pagerank[int(doc_id)] if int(doc_id) < len(pagerank) else 0.0
+            cosine_similarity *= 1 + pagerank_weight * static_rank
         results.append((doc_id, cosine_similarity))
 
-    return sorted(results, key=lambda x: x[1], reverse=True)
+    return sorted(results, key=ranking_key)
+
+
+def search(
+        query_lemmas: List[str],
+        index: Dict[str, List[int]],
+        doc_tfidf: Dict[str, Dict[str, float]],
+        doc_lengths: Dict[str, float],
+        pagerank: Optional[List[float]] = None,
+        pagerank_weight: float = PAGERANK_WEIGHT
+) -> List[Tuple[str, float]]:
+    relevant_docs = set()
+    for lemma in query_lemmas:
+        relevant_docs |= relevant_documents(lemma, index)
+
+    return rank_documents(query_lemmas, relevant_docs, doc_tfidf, doc_lengths, pagerank, pagerank_weight)
 
 
 def main():
@@ -120,6 +149,7 @@ def main():
     lemmas = load_lemmas()
     index = load_inverted_index()
     doc_tfidf, doc_lengths = load_tfidf_data()
+    pagerank = load_pagerank()
 
     if not lemmas or not index or not doc_tfidf:
         print("Не удалось загрузить необходимые данные!")
@@ -156,7 +186,7 @@ def main():
             print("Не найдено подходящих лемм для запроса.", query_lemmas)
             continue
 
-        results = search(query_lemmas, index, doc_tfidf, doc_lengths)
+        results = search(query_lemmas, index, doc_tfidf, doc_lengths, pagerank)
 
         if not results:
             print("Ничего не найдено.")
@@ -20,6 +20,7 @@ def get_text_from_html(file_path):
 
 class Lemmatisator:
     BAD_TOKENS_TAGS = {"PREP", "CONJ", "PRCL", "INTJ", "LATN", "PNCT", "NUMB", "ROMN", "UNKN"}
+    MIN_SCORE = 0.5
 
     def __init__(self):
         self.stop_words = set(stopwords.words("russian"))
@@ -35,16 +36,21 @@ class Lemmatisator:
         lemmas = self.build_lemmas(filtered_tokens)
         return filtered_tokens, lemmas
 
+    def filter_reason(self, token, parse):
+        """Причина, по которой токен отбрасывается ("tag", "stopword", "score"), или None"""
+        if any([x for x in self.BAD_TOKENS_TAGS if x in parse.tag]):
+            return "tag"
+        if token in self.stop_words:
+            return "stopword"
+        if parse.score < self.MIN_SCORE:
+            return "score"
+        return None
+
     def filter_tokens(self, tokens):
         good_tokens = set()
         for token in tokens:
             morph = self.morph_analyzer.parse(token)
-            if (
-                    any([x for x in self.BAD_TOKENS_TAGS if x in morph[0].tag])
-                    or token in self.stop_words
-            ):
-                continue
-            if morph[0].score >= 0.5:
+            if self.filter_reason(token, morph[0]) is None:
                 good_tokens.add(token)
         self.tokens = good_tokens  # Сохраняем токены в атрибуте экземпляра
 